@@ -8,11 +8,14 @@ Tests for the old L{twisted.web.client} APIs, C{getPage} and friends.
 
 import io
 import os
+import re
 from errno import ENOSPC
-from urllib.parse import urljoin, urlparse
+from typing import Optional
+from urllib.parse import urlparse
 
 from twisted import test
 from twisted.internet import address, defer, interfaces, reactor
+from twisted.internet.error import ConnectionDone
 from twisted.internet.protocol import ClientFactory
 from twisted.logger import (
     FilteringLogObserver,
@@ -23,6 +26,7 @@ from twisted.logger import (
 )
 from twisted.protocols.policies import WrappingFactory
 from twisted.python.compat import nativeString, networkString
+from twisted.python.failure import Failure
 from twisted.python.filepath import FilePath
 from twisted.python.reflect import requireModule
 from twisted.test.proto_helpers import (
@@ -41,9 +45,35 @@ from twisted.web.util import Redirect
 
 ssl = requireModule("twisted.internet.ssl")
 
+sslSkip: Optional[str] = None
+if ssl is None or not hasattr(ssl, "DefaultOpenSSLContextFactory"):
+    sslSkip = "OpenSSL not present"
+elif not interfaces.IReactorSSL(reactor, None):
+    sslSkip = "Reactor doesn't support SSL"
+
 serverPEM = FilePath(test.__file__).sibling("server.pem")
 serverPEMPath = serverPEM.asBytesMode().path
 
+_HEADER_RE = re.compile(rb"^([^:\r\n]+):[ \t]*([^\r\n]*)\r\n", re.MULTILINE)
+
+_serverContextFactory = None
+
+
+def serverContextFactory():
+    """
+    Get the TLS context factory shared by the servers in these tests, which
+    use C{serverPEM} as their certificate and key.  It is created the first
+    time it is needed.
+
+    @rtype: L{ssl.DefaultOpenSSLContextFactory}
+    """
+    global _serverContextFactory
+    if _serverContextFactory is None:
+        _serverContextFactory = ssl.DefaultOpenSSLContextFactory(
+            serverPEMPath, serverPEMPath
+        )
+    return _serverContextFactory
+
 
 class ExtendedRedirect(resource.Resource):
     """
@@ -71,9 +101,6 @@ class ExtendedRedirect(resource.Resource):
             code = int(request.args[b"code"][0])
             return self.redirectTo(self.url, request, code)
 
-    def getChild(self, name, request):
-        return self
-
     def redirectTo(self, url, request, code):
         request.setResponseCode(code)
         request.setHeader(b"location", url)
@@ -113,11 +140,10 @@ class ForeverTakingNoReadingResource(resource.Resource):
 
 class CookieMirrorResource(resource.Resource):
     def render(self, request):
-        l = []
-        for k, v in sorted(list(request.received_cookies.items())):
-            l.append((nativeString(k), nativeString(v)))
-        l.sort()
-        return networkString(repr(l))
+        items = sorted(request.received_cookies.items())
+        return networkString(
+            repr([(nativeString(k), nativeString(v)) for k, v in items])
+        )
 
 
 class RawCookieMirrorResource(resource.Resource):
@@ -160,25 +186,13 @@ class PayloadResource(resource.Resource):
 
     def render(self, request):
         data = request.content.read()
-        contentLength = request.requestHeaders.getRawHeaders(b"content-length")[0]
-        if len(data) != 100 or int(contentLength) != 100:
+        headers = request.requestHeaders
+        contentLength = headers.getRawHeaders(b"content-length", [b"0"])[0]
+        if len(data) != 100 or contentLength != b"100":
             return b"ERROR"
         return data
 
 
-class DelayResource(resource.Resource):
-    def __init__(self, seconds):
-        self.seconds = seconds
-
-    def render(self, request):
-        def response():
-            request.write(b"some bytes")
-            request.finish()
-
-        reactor.callLater(self.seconds, response)
-        return server.NOT_DONE_YET
-
-
 class BrokenDownloadResource(resource.Resource):
     def render(self, request):
         # only sends 3 bytes even though it claims to send 5
@@ -187,6 +201,23 @@ class BrokenDownloadResource(resource.Resource):
         return b""
 
 
+class MemoryFile(io.BytesIO):
+    """
+    An in-memory file for L{client.downloadPage} to write to, which keeps
+    the downloaded bytes available after the downloader closes it.
+
+    @ivar value: The bytes written to the file, set when it is closed.
+    @type value: L{bytes}
+    """
+
+    value = None
+
+    def close(self):
+        if not self.closed:
+            self.value = self.getvalue()
+        io.BytesIO.close(self)
+
+
 class CountingRedirect(Redirect):
     """
     A L{Redirect} resource that keeps track of the number of times the
@@ -227,15 +258,12 @@ class URLJoinTests(unittest.TestCase):
         resulting URL if neither the base nor the new path include a fragment
         identifier.
         """
-        self.assertEqual(
-            client._urljoin(b"http://foo.com/bar", b"/quux"), b"http://foo.com/quux"
-        )
-        self.assertEqual(
-            client._urljoin(b"http://foo.com/bar#", b"/quux"), b"http://foo.com/quux"
-        )
-        self.assertEqual(
-            client._urljoin(b"http://foo.com/bar", b"/quux#"), b"http://foo.com/quux"
-        )
+        for base, url in [
+            (b"http://foo.com/bar", b"/quux"),
+            (b"http://foo.com/bar#", b"/quux"),
+            (b"http://foo.com/bar", b"/quux#"),
+        ]:
+            self.assertEqual(client._urljoin(base, url), b"http://foo.com/quux")
 
     def test_preserveFragments(self):
         """
@@ -245,18 +273,12 @@ class URLJoinTests(unittest.TestCase):
 
         @see: U{https://tools.ietf.org/html/draft-ietf-httpbis-p2-semantics-22#section-7.1.2}
         """
-        self.assertEqual(
-            client._urljoin(b"http://foo.com/bar#frag", b"/quux"),
-            b"http://foo.com/quux#frag",
-        )
-        self.assertEqual(
-            client._urljoin(b"http://foo.com/bar", b"/quux#frag2"),
-            b"http://foo.com/quux#frag2",
-        )
-        self.assertEqual(
-            client._urljoin(b"http://foo.com/bar#frag", b"/quux#frag2"),
-            b"http://foo.com/quux#frag2",
-        )
+        for base, url, expected in [
+            (b"http://foo.com/bar#frag", b"/quux", b"http://foo.com/quux#frag"),
+            (b"http://foo.com/bar", b"/quux#frag2", b"http://foo.com/quux#frag2"),
+            (b"http://foo.com/bar#frag", b"/quux#frag2", b"http://foo.com/quux#frag2"),
+        ]:
+            self.assertEqual(client._urljoin(base, url), expected)
 
 
 class HTTPPageGetterTests(unittest.TestCase):
@@ -306,10 +328,64 @@ class HTTPPageGetterTests(unittest.TestCase):
         ]:
             self.assertIn(expectedHeader, result)
 
+    def _getPage(self, response, **kwargs):
+        """
+        Request I{http://example.com/file} with a L{client.HTTPClientFactory}
+        over a L{StringTransport}, deliver C{response} to it and then close
+        the connection.
+
+        @param response: The complete HTTP response to deliver.
+        @type response: L{bytes}
+
+        @param kwargs: Additional keyword arguments for
+            L{client.HTTPClientFactory}.
+
+        @return: The factory's result L{Deferred}.
+        """
+        factory = client.HTTPClientFactory(b"http://example.com/file", **kwargs)
+        protocol = factory.buildProtocol(address.IPv4Address("TCP", "127.0.0.1", 80))
+        protocol.makeConnection(StringTransport())
+        protocol.dataReceived(response)
+        protocol.connectionLost(Failure(ConnectionDone()))
+        return factory.deferred
+
+    def test_responseBody(self):
+        """
+        The result L{Deferred} of L{client.HTTPClientFactory} fires with the
+        body of a successful response once the connection is closed.
+        """
+        d = self._getPage(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n0123456789")
+        self.assertEqual(self.successResultOf(d), b"0123456789")
+
+    def test_headResponse(self):
+        """
+        The result L{Deferred} of L{client.HTTPClientFactory} fires with the
+        empty string for a successful response to a I{HEAD} request, even
+        though the response gives a non-zero I{Content-Length}.
+        """
+        d = self._getPage(
+            b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n", method=b"HEAD"
+        )
+        self.assertEqual(self.successResultOf(d), b"")
+
+    def test_redirectNotFollowed(self):
+        """
+        If C{followRedirect} is false, the result L{Deferred} of
+        L{client.HTTPClientFactory} fails with L{error.PageRedirect} carrying
+        the I{Location} of a redirect response.
+        """
+        d = self._getPage(
+            b"HTTP/1.1 302 Found\r\nLocation: /file\r\nContent-Length: 0\r\n\r\n",
+            followRedirect=False,
+        )
+        exc = self.failureResultOf(d, error.PageRedirect).value
+        self.assertEqual(exc.location, b"/file")
+
 
 class WebClientTests(unittest.TestCase):
     suppress = [util.suppress(category=DeprecationWarning)]
     _log = Logger()
+    _scheme = b"http"
 
     def _listen(self, site):
         return reactor.listenTCP(0, site, interface="127.0.0.1")
@@ -317,37 +393,40 @@ class WebClientTests(unittest.TestCase):
     def setUp(self):
         self.agent = None  # for twisted.web.client.Agent test
         self.cleanupServerConnections = 0
-        r = resource.Resource()
-        r.putChild(b"file", Data(b"0123456789", "text/html"))
-        r.putChild(b"redirect", Redirect(b"/file"))
         self.infiniteRedirectResource = CountingRedirect(b"/infiniteRedirect")
-        r.putChild(b"infiniteRedirect", self.infiniteRedirectResource)
-        r.putChild(b"wait", ForeverTakingResource())
-        r.putChild(b"write-then-wait", ForeverTakingResource(write=True))
-        r.putChild(b"never-read", ForeverTakingNoReadingResource())
-        r.putChild(b"error", ErrorResource())
-        r.putChild(b"nolength", NoLengthResource())
-        r.putChild(b"host", HostHeaderResource())
-        r.putChild(b"payload", PayloadResource())
-        r.putChild(b"broken", BrokenDownloadResource())
-        r.putChild(b"cookiemirror", CookieMirrorResource())
-        r.putChild(b"delay1", DelayResource(1))
-        r.putChild(b"delay2", DelayResource(2))
-
         self.afterFoundGetCounter = CountingResource()
-        r.putChild(b"afterFoundGetCounter", self.afterFoundGetCounter)
-        r.putChild(b"afterFoundGetRedirect", Redirect(b"/afterFoundGetCounter"))
+        self.extendedRedirect = ExtendedRedirect(b"/extendedRedirect")
 
         miscasedHead = Data(b"miscased-head GET response content", "major/minor")
         miscasedHead.render_Head = lambda request: b"miscased-head content"
-        r.putChild(b"miscased-head", miscasedHead)
 
-        self.extendedRedirect = ExtendedRedirect(b"/extendedRedirect")
-        r.putChild(b"extendedRedirect", self.extendedRedirect)
+        children = {
+            b"file": Data(b"0123456789", "text/html"),
+            b"redirect": Redirect(b"/file"),
+            b"infiniteRedirect": self.infiniteRedirectResource,
+            b"wait": ForeverTakingResource(),
+            b"write-then-wait": ForeverTakingResource(write=True),
+            b"never-read": ForeverTakingNoReadingResource(),
+            b"error": ErrorResource(),
+            b"nolength": NoLengthResource(),
+            b"host": HostHeaderResource(),
+            b"payload": PayloadResource(),
+            b"broken": BrokenDownloadResource(),
+            b"cookiemirror": CookieMirrorResource(),
+            b"afterFoundGetCounter": self.afterFoundGetCounter,
+            b"afterFoundGetRedirect": Redirect(b"/afterFoundGetCounter"),
+            b"miscased-head": miscasedHead,
+            b"extendedRedirect": self.extendedRedirect,
+        }
+        r = resource.Resource()
+        for path, child in children.items():
+            r.putChild(path, child)
         self.site = server.Site(r, timeout=None)
         self.wrapper = WrappingFactory(self.site)
         self.port = self._listen(self.wrapper)
         self.portno = self.port.getHost().port
+        self._hostHeader = b"127.0.0.1:%d" % (self.portno,)
+        self._urlPrefix = b"%s://%s/" % (self._scheme, self._hostHeader)
 
     def tearDown(self):
         if self.agent:
@@ -372,8 +451,7 @@ class WebClientTests(unittest.TestCase):
         )
 
     def getURL(self, path):
-        host = "http://127.0.0.1:%d/" % self.portno
-        return networkString(urljoin(host, nativeString(path)))
+        return self._urlPrefix + networkString(path)
 
     def testPayload(self):
         s = b"0123456789" * 10
@@ -461,7 +539,7 @@ class WebClientTests(unittest.TestCase):
         return defer.gatherResults(
             [
                 client.getPage(self.getURL("host")).addCallback(
-                    self.assertEqual, b"127.0.0.1:%d" % (self.portno,)
+                    self.assertEqual, self._hostHeader
                 ),
                 client.getPage(
                     self.getURL("host"), headers={b"Host": b"www.example.com"}
@@ -505,7 +583,7 @@ class WebClientTests(unittest.TestCase):
         called back with the contents of the page.
         """
         d = client.getPage(self.getURL("host"), timeout=100)
-        d.addCallback(self.assertEqual, networkString(f"127.0.0.1:{self.portno}"))
+        d.addCallback(self.assertEqual, self._hostHeader)
         return d
 
     def test_timeoutTriggering(self):
@@ -523,20 +601,18 @@ class WebClientTests(unittest.TestCase):
     def testDownloadPage(self):
         downloads = []
         downloadData = [
-            ("file", self.mktemp(), b"0123456789"),
-            ("nolength", self.mktemp(), b"nolength"),
+            ("file", MemoryFile(), b"0123456789"),
+            ("nolength", MemoryFile(), b"nolength"),
         ]
 
-        for (url, name, data) in downloadData:
-            d = client.downloadPage(self.getURL(url), name)
-            d.addCallback(self._cbDownloadPageTest, data, name)
+        for (url, file, data) in downloadData:
+            d = client.downloadPage(self.getURL(url), file)
+            d.addCallback(self._cbDownloadPageTest, data, file)
             downloads.append(d)
         return defer.gatherResults(downloads)
 
-    def _cbDownloadPageTest(self, ignored, data, name):
-        with open(name, "rb") as f:
-            bytes = f.read()
-        self.assertEqual(bytes, data)
+    def _cbDownloadPageTest(self, ignored, data, file):
+        self.assertEqual(file.value, data)
 
     def testDownloadPageError1(self):
         class errorfile:
@@ -587,14 +663,14 @@ class WebClientTests(unittest.TestCase):
             d = self.assertFailure(d, error.Error)
             d.addCallback(lambda exc, code=code: self.assertEqual(exc.args[0], code))
             dl.append(d)
-        return defer.DeferredList(dl, fireOnOneErrback=True)
+        return defer.gatherResults(dl, consumeErrors=True)
 
     def testServerError(self):
         return self._downloadTest(lambda url: client.getPage(self.getURL(url)))
 
     def testDownloadServerError(self):
         return self._downloadTest(
-            lambda url: client.downloadPage(self.getURL(url), url.split("?")[0])
+            lambda url: client.downloadPage(self.getURL(url), MemoryFile())
         )
 
     def testFactoryInfo(self):
@@ -699,7 +775,7 @@ class WebClientTests(unittest.TestCase):
             )
 
         d = client.downloadPage(
-            url, "downloadTemp", followRedirect=True, afterFoundGet=True, method=b"POST"
+            url, MemoryFile(), followRedirect=True, afterFoundGet=True, method=b"POST"
         )
         d.addCallback(gotPage)
         return d
@@ -729,12 +805,12 @@ class WebClientTests(unittest.TestCase):
         """
         self.cleanupServerConnections = 2
         # Verify the behavior if no bytes are ever written.
-        first = client.downloadPage(self.getURL("wait"), self.mktemp(), timeout=0.01)
+        first = client.downloadPage(self.getURL("wait"), MemoryFile(), timeout=0.01)
 
         # Verify the behavior if some bytes are written but then the request
         # never completes.
         second = client.downloadPage(
-            self.getURL("write-then-wait"), self.mktemp(), timeout=0.01
+            self.getURL("write-then-wait"), MemoryFile(), timeout=0.01
         )
 
         return defer.gatherResults(
@@ -757,7 +833,7 @@ class WebClientTests(unittest.TestCase):
 
         # The timeout here needs to be slightly longer to give the resource a
         # change to stop the reading.
-        d = client.downloadPage(self.getURL("never-read"), self.mktemp(), timeout=0.05)
+        d = client.downloadPage(self.getURL("never-read"), MemoryFile(), timeout=0.05)
         return self.assertFailure(d, defer.TimeoutError)
 
     def test_downloadHeaders(self):
@@ -771,10 +847,9 @@ class WebClientTests(unittest.TestCase):
             self.assertEqual(factory.status, b"200")
             self.assertEqual(factory.response_headers[b"content-type"][0], b"text/html")
             self.assertEqual(factory.response_headers[b"content-length"][0], b"10")
-            os.unlink(factory.fileName)
 
         factory = client._makeGetterFactory(
-            self.getURL("file"), client.HTTPDownloader, fileOrName=self.mktemp()
+            self.getURL("file"), client.HTTPDownloader, fileOrName=MemoryFile()
         )
         return factory.deferred.addCallback(lambda _: checkHeaders(factory))
 
@@ -784,7 +859,7 @@ class WebClientTests(unittest.TestCase):
         initializer is used to populate the I{Cookie} header included in the
         request sent to the server.
         """
-        output = self.mktemp()
+        output = MemoryFile()
         factory = client._makeGetterFactory(
             self.getURL("cookiemirror"),
             client.HTTPDownloader,
@@ -793,7 +868,7 @@ class WebClientTests(unittest.TestCase):
         )
 
         def cbFinished(ignored):
-            self.assertEqual(FilePath(output).getContent(), b"[('foo', 'bar')]")
+            self.assertEqual(output.value, b"[('foo', 'bar')]")
 
         factory.deferred.addCallback(cbFinished)
         return factory.deferred
@@ -811,7 +886,7 @@ class WebClientTests(unittest.TestCase):
         f = client._makeGetterFactory(
             self.getURL("infiniteRedirect"),
             client.HTTPDownloader,
-            fileOrName=self.mktemp(),
+            fileOrName=MemoryFile(),
             redirectLimit=7,
         )
         d = self.assertFailure(f.deferred, error.InfiniteRedirection)
@@ -858,25 +933,19 @@ class WebClientTests(unittest.TestCase):
 
 class WebClientSSLTests(WebClientTests):
 
-    if ssl is None or not hasattr(ssl, "DefaultOpenSSLContextFactory"):
-        skip = "OpenSSL not present"
+    if sslSkip:
+        skip = sslSkip
 
-    if not interfaces.IReactorSSL(reactor, None):
-        skip = "Reactor doesn't support SSL"
+    _scheme = b"https"
 
     def _listen(self, site):
         return reactor.listenSSL(
             0,
             site,
-            contextFactory=ssl.DefaultOpenSSLContextFactory(
-                serverPEMPath, serverPEMPath
-            ),
+            contextFactory=serverContextFactory(),
             interface="127.0.0.1",
         )
 
-    def getURL(self, path):
-        return networkString("https://127.0.0.1:%d/%s" % (self.portno, path))
-
     def testFactoryInfo(self):
         url = self.getURL("file")
         uri = client.URI.fromBytes(url)
@@ -891,17 +960,14 @@ class WebClientSSLTests(WebClientTests):
 class WebClientRedirectBetweenSSLandPlainTextTests(unittest.TestCase):
     suppress = [util.suppress(category=DeprecationWarning)]
 
-    if ssl is None or not hasattr(ssl, "DefaultOpenSSLContextFactory"):
-        skip = "OpenSSL not present"
-
-    if not interfaces.IReactorSSL(reactor, None):
-        skip = "Reactor doesn't support SSL"
+    if sslSkip:
+        skip = sslSkip
 
     def getHTTPS(self, path):
-        return networkString(f"https://127.0.0.1:{self.tlsPortno}/{path}")
+        return self._httpsBase + networkString(path)
 
     def getHTTP(self, path):
-        return networkString(f"http://127.0.0.1:{self.plainPortno}/{path}")
+        return self._httpBase + networkString(path)
 
     def setUp(self):
         plainRoot = Data(b"not me", "text/plain")
@@ -913,15 +979,15 @@ class WebClientRedirectBetweenSSLandPlainTextTests(unittest.TestCase):
         self.tlsPort = reactor.listenSSL(
             0,
             tlsSite,
-            contextFactory=ssl.DefaultOpenSSLContextFactory(
-                serverPEMPath, serverPEMPath
-            ),
+            contextFactory=serverContextFactory(),
             interface="127.0.0.1",
         )
         self.plainPort = reactor.listenTCP(0, plainSite, interface="127.0.0.1")
 
         self.plainPortno = self.plainPort.getHost().port
         self.tlsPortno = self.tlsPort.getHost().port
+        self._httpBase = b"http://127.0.0.1:%d/" % (self.plainPortno,)
+        self._httpsBase = b"https://127.0.0.1:%d/" % (self.tlsPortno,)
 
         plainRoot.putChild(b"one", Redirect(self.getHTTPS("two")))
         tlsRoot.putChild(b"two", Redirect(self.getHTTP("three")))
@@ -929,13 +995,8 @@ class WebClientRedirectBetweenSSLandPlainTextTests(unittest.TestCase):
         tlsRoot.putChild(b"four", Data(b"FOUND IT!", "text/plain"))
 
     def tearDown(self):
-        ds = list(
-            map(
-                defer.maybeDeferred,
-                [self.plainPort.stopListening, self.tlsPort.stopListening],
-            )
-        )
-        return defer.gatherResults(ds)
+        ds = [self.plainPort.stopListening(), self.tlsPort.stopListening()]
+        return defer.gatherResults([d for d in ds if d is not None])
 
     def testHoppingAround(self):
         return client.getPage(self.getHTTP("one")).addCallback(
@@ -956,12 +1017,13 @@ class CookieTests(unittest.TestCase):
         site = server.Site(root, timeout=None)
         self.port = self._listen(site)
         self.portno = self.port.getHost().port
+        self._httpBase = b"http://127.0.0.1:%d/" % (self.portno,)
 
     def tearDown(self):
         return self.port.stopListening()
 
     def getHTTP(self, path):
-        return networkString("http://127.0.0.1:%d/%s" % (self.portno, path))
+        return self._httpBase + networkString(path)
 
     def testNoCookies(self):
         return client.getPage(self.getHTTP("cookiemirror")).addCallback(
@@ -985,12 +1047,21 @@ class CookieTests(unittest.TestCase):
             self.getHTTP("rawcookiemirror"), cookies=cookies
         ).addCallback(self.assertIn, (b"'foo=bar; baz=quux'", b"'baz=quux; foo=bar'"))
 
+
+class CookieParsingTests(unittest.SynchronousTestCase):
+    """
+    Tests for the handling of I{Set-Cookie} response headers by
+    L{client.HTTPClientFactory}, which need no network connection.
+    """
+
+    suppress = [util.suppress(category=DeprecationWarning)]
+
     def testCookieHeaderParsing(self):
         factory = client.HTTPClientFactory(b"http://foo.example.com/")
         proto = factory.buildProtocol("127.42.42.42")
         transport = StringTransport()
         proto.makeConnection(transport)
-        for line in [
+        lines = [
             b"200 Ok",
             b"Squash: yes",
             b"Hands: stolen",
@@ -1001,8 +1072,8 @@ class CookieTests(unittest.TestCase):
             b"",
             b"body",
             b"more body",
-        ]:
-            proto.dataReceived(line + b"\r\n")
+        ]
+        proto.dataReceived(b"\r\n".join(lines) + b"\r\n")
         self.assertEqual(
             transport.value(),
             b"GET / HTTP/1.0\r\n"
@@ -1033,77 +1104,68 @@ class HostHeaderTests(unittest.TestCase):
         Retrieve the value of the I{Host} header from the serialized
         request given by C{bytes}.
         """
-        for line in bytes.split(b"\r\n"):
-            try:
-                name, value = line.split(b":", 1)
-                if name.strip().lower() == b"host":
-                    return value.strip()
-            except ValueError:
-                pass
+        for match in _HEADER_RE.finditer(bytes):
+            if match.group(1).strip().lower() == b"host":
+                return match.group(2).strip()
+
+    def assertHostHeader(self, url, host):
+        """
+        Assert that the request sent by the protocol of a
+        L{client.HTTPClientFactory} for C{url} has C{host} as the value of its
+        I{Host} header.
+
+        @param url: The URL to request.
+        @type url: L{bytes}
+
+        @param host: The expected value of the I{Host} header.
+        @type host: L{bytes}
+        """
+        factory = client.HTTPClientFactory(url)
+        proto = factory.buildProtocol("127.42.42.42")
+        proto.makeConnection(StringTransport())
+        self.assertEqual(self._getHost(proto.transport.value()), host)
 
     def test_HTTPDefaultPort(self):
         """
         No port should be included in the host header when connecting to the
         default HTTP port.
         """
-        factory = client.HTTPClientFactory(b"http://foo.example.com/")
-        proto = factory.buildProtocol(b"127.42.42.42")
-        proto.makeConnection(StringTransport())
-        self.assertEqual(self._getHost(proto.transport.value()), b"foo.example.com")
+        self.assertHostHeader(b"http://foo.example.com/", b"foo.example.com")
 
     def test_HTTPPort80(self):
         """
         No port should be included in the host header when connecting to the
         default HTTP port even if it is in the URL.
         """
-        factory = client.HTTPClientFactory(b"http://foo.example.com:80/")
-        proto = factory.buildProtocol("127.42.42.42")
-        proto.makeConnection(StringTransport())
-        self.assertEqual(self._getHost(proto.transport.value()), b"foo.example.com")
+        self.assertHostHeader(b"http://foo.example.com:80/", b"foo.example.com")
 
     def test_HTTPNotPort80(self):
         """
         The port should be included in the host header when connecting to the
         a non default HTTP port.
         """
-        factory = client.HTTPClientFactory(b"http://foo.example.com:8080/")
-        proto = factory.buildProtocol("127.42.42.42")
-        proto.makeConnection(StringTransport())
-        self.assertEqual(
-            self._getHost(proto.transport.value()), b"foo.example.com:8080"
-        )
+        self.assertHostHeader(b"http://foo.example.com:8080/", b"foo.example.com:8080")
 
     def test_HTTPSDefaultPort(self):
         """
         No port should be included in the host header when connecting to the
         default HTTPS port.
         """
-        factory = client.HTTPClientFactory(b"https://foo.example.com/")
-        proto = factory.buildProtocol("127.42.42.42")
-        proto.makeConnection(StringTransport())
-        self.assertEqual(self._getHost(proto.transport.value()), b"foo.example.com")
+        self.assertHostHeader(b"https://foo.example.com/", b"foo.example.com")
 
     def test_HTTPSPort443(self):
         """
         No port should be included in the host header when connecting to the
         default HTTPS port even if it is in the URL.
         """
-        factory = client.HTTPClientFactory(b"https://foo.example.com:443/")
-        proto = factory.buildProtocol("127.42.42.42")
-        proto.makeConnection(StringTransport())
-        self.assertEqual(self._getHost(proto.transport.value()), b"foo.example.com")
+        self.assertHostHeader(b"https://foo.example.com:443/", b"foo.example.com")
 
     def test_HTTPSNotPort443(self):
         """
         The port should be included in the host header when connecting to the
         a non default HTTPS port.
         """
-        factory = client.HTTPClientFactory(b"http://foo.example.com:8080/")
-        proto = factory.buildProtocol("127.42.42.42")
-        proto.makeConnection(StringTransport())
-        self.assertEqual(
-            self._getHost(proto.transport.value()), b"foo.example.com:8080"
-        )
+        self.assertHostHeader(b"https://foo.example.com:8443/", b"foo.example.com:8443")
 
 
 class URITests:
@@ -1189,6 +1251,30 @@ class URITests:
             ),
         )
 
+    def assertParsesAs(self, template, **components):
+        """
+        Assert that an I{http} URI for this test's host parses into the given
+        components and serializes back to the same bytes.
+
+        @param template: A URI containing "HOST", see L{makeURIString}.
+        @type template: L{bytes}
+
+        @param components: The expected values of the components besides the
+            scheme, network location, host and port, as accepted by
+            L{assertURIEquals}.
+        """
+        uri = self.makeURIString(template)
+        parsed = client.URI.fromBytes(uri)
+        self.assertURIEquals(
+            parsed,
+            scheme=b"http",
+            netloc=self.uriHost,
+            host=self.host,
+            port=80,
+            **components,
+        )
+        self.assertEqual(uri, parsed.toBytes())
+
     def test_parseDefaultPort(self):
         """
         L{client.URI.fromBytes} by default assumes port 80 for the I{http}
@@ -1232,33 +1318,13 @@ class URITests:
         """
         Parse the path from a I{URI}.
         """
-        uri = self.makeURIString(b"http://HOST/foo/bar")
-        parsed = client.URI.fromBytes(uri)
-        self.assertURIEquals(
-            parsed,
-            scheme=b"http",
-            netloc=self.uriHost,
-            host=self.host,
-            port=80,
-            path=b"/foo/bar",
-        )
-        self.assertEqual(uri, parsed.toBytes())
+        self.assertParsesAs(b"http://HOST/foo/bar", path=b"/foo/bar")
 
     def test_noPath(self):
         """
         The path of a I{URI} that has no path is the empty string.
         """
-        uri = self.makeURIString(b"http://HOST")
-        parsed = client.URI.fromBytes(uri)
-        self.assertURIEquals(
-            parsed,
-            scheme=b"http",
-            netloc=self.uriHost,
-            host=self.host,
-            port=80,
-            path=b"",
-        )
-        self.assertEqual(uri, parsed.toBytes())
+        self.assertParsesAs(b"http://HOST", path=b"")
 
     def test_emptyPath(self):
         """
@@ -1278,55 +1344,32 @@ class URITests:
         """
         Parse I{URI} parameters from a I{URI}.
         """
-        uri = self.makeURIString(b"http://HOST/foo/bar;param")
-        parsed = client.URI.fromBytes(uri)
-        self.assertURIEquals(
-            parsed,
-            scheme=b"http",
-            netloc=self.uriHost,
-            host=self.host,
-            port=80,
-            path=b"/foo/bar",
-            params=b"param",
+        self.assertParsesAs(
+            b"http://HOST/foo/bar;param", path=b"/foo/bar", params=b"param"
         )
-        self.assertEqual(uri, parsed.toBytes())
 
     def test_query(self):
         """
         Parse the query string from a I{URI}.
         """
-        uri = self.makeURIString(b"http://HOST/foo/bar;param?a=1&b=2")
-        parsed = client.URI.fromBytes(uri)
-        self.assertURIEquals(
-            parsed,
-            scheme=b"http",
-            netloc=self.uriHost,
-            host=self.host,
-            port=80,
+        self.assertParsesAs(
+            b"http://HOST/foo/bar;param?a=1&b=2",
             path=b"/foo/bar",
             params=b"param",
             query=b"a=1&b=2",
         )
-        self.assertEqual(uri, parsed.toBytes())
 
     def test_fragment(self):
         """
         Parse the fragment identifier from a I{URI}.
         """
-        uri = self.makeURIString(b"http://HOST/foo/bar;param?a=1&b=2#frag")
-        parsed = client.URI.fromBytes(uri)
-        self.assertURIEquals(
-            parsed,
-            scheme=b"http",
-            netloc=self.uriHost,
-            host=self.host,
-            port=80,
+        self.assertParsesAs(
+            b"http://HOST/foo/bar;param?a=1&b=2#frag",
             path=b"/foo/bar",
             params=b"param",
             query=b"a=1&b=2",
             fragment=b"frag",
         )
-        self.assertEqual(uri, parsed.toBytes())
 
     def test_originForm(self):
         """
@@ -1480,7 +1523,7 @@ class DeprecationTests(unittest.TestCase):
         """
         getattr(client, klass)
 
-        warningInfo = self.flushWarnings()
+        warningInfo = self.flushWarnings([self._testDeprecatedClass])
         self.assertEqual(len(warningInfo), 1)
         self.assertEqual(warningInfo[0]["category"], DeprecationWarning)
         self.assertEqual(
@@ -1586,6 +1629,18 @@ class DownloadPageURIInjectionTests(
         client.downloadPage(uri, file=io.BytesIO())
 
 
+class _PageGetterFactory(ClientFactory):
+    """
+    A L{ClientFactory} providing the request attributes which
+    L{client.HTTPPageGetter} reads from its factory.  The ones that are the
+    same for every request are class attributes.
+    """
+
+    scheme = b"http"
+    port = 0
+    agent = b"User/Agent"
+
+
 def makeHTTPPageGetterFactory(protocolClass, method, host, path):
     """
     Make a L{ClientFactory} that can be used with
@@ -1602,22 +1657,51 @@ def makeHTTPPageGetterFactory(protocolClass, method, host, path):
 
     @return: A L{ClientFactory}.
     """
-    factory = ClientFactory.forProtocol(protocolClass)
+    factory = _PageGetterFactory.forProtocol(protocolClass)
 
     factory.method = method
     factory.host = host
     factory.path = path
 
-    factory.scheme = b"http"
-    factory.port = 0
     factory.headers = {}
-    factory.agent = b"User/Agent"
     factory.cookies = {}
 
     return factory
 
 
+class PageGetterInjectionMixin:
+    """
+    Set up a L{StringTransport} and a page getter factory for
+    C{protocolClass} which every attempted injection in a test reuses.
+
+    @ivar protocolClass: The L{client.HTTPPageGetter} subclass under test.
+    """
+
+    protocolClass = client.HTTPPageGetter
+
+    def setUp(self):
+        self.transport = StringTransport()
+        self.factory = makeHTTPPageGetterFactory(
+            self.protocolClass,
+            method=b"GET",
+            host=b"twisted.invalid",
+            path=b"/",
+        )
+
+    def connectGetter(self):
+        """
+        Connect a new protocol from C{self.factory} to C{self.transport},
+        discarding whatever an earlier attempt wrote.
+        """
+        self.transport.clear()
+        getter = self.factory.buildProtocol(
+            address.IPv4Address("TCP", "127.0.0.1", 0),
+        )
+        getter.makeConnection(self.transport)
+
+
 class HTTPPageGetterMethodInjectionTests(
+    PageGetterInjectionMixin,
     MethodInjectionTestsMixin,
     unittest.SynchronousTestCase,
 ):
@@ -1625,28 +1709,18 @@ class HTTPPageGetterMethodInjectionTests(
     Test L{client.HTTPPageGetter} against HTTP method injections.
     """
 
-    protocolClass = client.HTTPPageGetter
-
     def attemptRequestWithMaliciousMethod(self, method):
         """
         Attempt a request with the provided method.
 
         @param method: L{MethodInjectionTestsMixin}
         """
-        transport = StringTransport()
-        factory = makeHTTPPageGetterFactory(
-            self.protocolClass,
-            method=method,
-            host=b"twisted.invalid",
-            path=b"/",
-        )
-        getter = factory.buildProtocol(
-            address.IPv4Address("TCP", "127.0.0.1", 0),
-        )
-        getter.makeConnection(transport)
+        self.factory.method = method
+        self.connectGetter()
 
 
 class HTTPPageGetterURIInjectionTests(
+    PageGetterInjectionMixin,
     URIInjectionTestsMixin,
     unittest.SynchronousTestCase,
 ):
@@ -1654,27 +1728,17 @@ class HTTPPageGetterURIInjectionTests(
     Test L{client.HTTPPageGetter} against HTTP URI injections.
     """
 
-    protocolClass = client.HTTPPageGetter
-
     def attemptRequestWithMaliciousURI(self, uri):
         """
         Attempt a request with the provided URI.
 
         @param uri: L{URIInjectionTestsMixin}
         """
-        transport = StringTransport()
         # Setting the host and path to the same value is imprecise but
         # doesn't require parsing an invalid URI.
-        factory = makeHTTPPageGetterFactory(
-            self.protocolClass,
-            method=b"GET",
-            host=uri,
-            path=uri,
-        )
-        getter = factory.buildProtocol(
-            address.IPv4Address("TCP", "127.0.0.1", 0),
-        )
-        getter.makeConnection(transport)
+        self.factory.host = uri
+        self.factory.path = uri
+        self.connectGetter()
 
 
 class HTTPPageDownloaderMethodInjectionTests(HTTPPageGetterMethodInjectionTests):
@@ -1736,13 +1800,16 @@ class HTTPClientFactorySetURLURIInjectionTests(
     Tests L{client.HTTPClientFactory.setURL} against HTTP URI injections.
     """
 
+    def setUp(self):
+        self.factory = client.HTTPClientFactory(b"https://twisted.invalid")
+
     def attemptRequestWithMaliciousURI(self, uri):
         """
         Attempt a request with the provided URI.
 
         @param uri: L{URIInjectionTestsMixin}
         """
-        client.HTTPClientFactory(b"https://twisted.invalid").setURL(uri)
+        self.factory.setURL(uri)
 
 
 class HTTPDownloaderMethodInjectionTests(
@@ -1791,14 +1858,16 @@ class HTTPDownloaderSetURLURIInjectionTests(
     Tests L{client.HTTPDownloader.setURL} against HTTP URI injections.
     """
 
+    def setUp(self):
+        self.downloader = client.HTTPDownloader(
+            b"https://twisted.invalid",
+            io.BytesIO(),
+        )
+
     def attemptRequestWithMaliciousURI(self, uri):
         """
         Attempt a request with the provided URI.
 
         @param uri: L{URIInjectionTestsMixin}
         """
-        downloader = client.HTTPDownloader(
-            b"https://twisted.invalid",
-            io.BytesIO(),
-        )
-        downloader.setURL(uri)
+        self.downloader.setURL(uri)